@@ -9,8 +9,8 @@ For the February 2026 Hands-On Session
 
 import streamlit as st
 import pandas as pd
+import numpy as np
 import datetime
-import random
 import time
 
 # ============================================================================
@@ -26,9 +26,18 @@ st.set_page_config(
 # ============================================================================
 # MOCK DATA GENERATORS
 # ============================================================================
-
+# Telemetry is generated through the cached build_telemetry() so Streamlit
+# reruns (every widget interaction) reuse the same DataFrames. Family frames
+# are keyed on their IDs, which is far cheaper than hashing the full frame,
+# plus the run's start time so each "Run Procedure" gets fresh telemetry.
+# The families literal is built once per process with cache_resource: a
+# module-level constant would be rebuilt on every rerun, since Streamlit
+# re-executes the whole script.
+_FAMILY_HASH_FUNCS = {pd.DataFrame: lambda df: tuple(df["family_id"])}
+
+@st.cache_resource
 def generate_mock_families():
-    """Generate sample family intake data"""
+    """Generate sample family intake data (shared read-only frame, never mutate)"""
     families = [
         {"family_id": 1, "family_name": "Johnson Family", "child_age": 8, "reading_score": 65, "math_score": 80, "focus_score": 55},
         {"family_id": 2, "family_name": "Chen Family", "child_age": 10, "reading_score": 45, "math_score": 50, "focus_score": 60},
@@ -39,173 +48,190 @@ def generate_mock_families():
     return pd.DataFrame(families)
 
 def categorize_support_level(reading_score, math_score, focus_score):
-    """Simulate the UDF logic"""
-    areas = []
-    if reading_score < 70:
-        areas.append("Reading")
-    if math_score < 70:
-        areas.append("Math")
-    if focus_score < 70:
-        areas.append("Focus")
-    
-    avg = (reading_score + math_score + focus_score) / 3
-    if avg < 50:
-        level = "Intensive"
-    elif avg < 70:
-        level = "Moderate"
-    else:
-        level = "Light Touch"
+    """Simulate the UDF logic. Accepts scalar scores or aligned Series of scores."""
+    reading, math, focus = np.asarray(reading_score), np.asarray(math_score), np.asarray(focus_score)
+    
+    areas = np.char.add(
+        np.char.add(
+            np.where(reading < 70, "Reading, ", ""),
+            np.where(math < 70, "Math, ", "")
+        ),
+        np.where(focus < 70, "Focus, ", "")
+    )
+    areas = np.char.rstrip(areas, ", ")
+    areas = np.where(areas == "", "General Support", areas)
     
-    return f"{level}: {', '.join(areas) if areas else 'General Support'}"
+    avg = (reading + math + focus) / 3
+    level = np.select([avg < 50, avg < 70], ["Intensive", "Moderate"], default="Light Touch")
+    
+    result = np.char.add(np.char.add(level, ": "), areas)
+    if isinstance(reading_score, pd.Series):
+        return pd.Series(result, index=reading_score.index)
+    return str(result)
 
 def generate_mock_logs(family_data):
     """Generate mock log entries"""
-    logs = []
-    base_time = datetime.datetime.now() - datetime.timedelta(minutes=5)
-    
-    logs.append({
-        "timestamp": base_time,
-        "logger_name": "intake_processor",
-        "log_level": "INFO",
-        "message": '{"event": "batch_started"}'
-    })
+    n = len(family_data)
+    base_time = np.datetime64(datetime.datetime.now()) - np.timedelta64(5, "m")
+    
+    # Per family: categorization started, categorization complete, family processed
+    family_ms = 2_000 + np.arange(n) * 2_000
+    offsets_ms = np.concatenate([
+        [0, 1_000],
+        np.column_stack([family_ms, family_ms + 500, family_ms + 1_000]).ravel(),
+        [15_000],
+    ])
+    timestamps = base_time + offsets_ms.astype("timedelta64[ms]")
+    
+    loggers = (
+        ["intake_processor"] * 2
+        + ["support_categorizer", "support_categorizer", "intake_processor"] * n
+        + ["intake_processor"]
+    )
     
-    logs.append({
-        "timestamp": base_time + datetime.timedelta(seconds=1),
-        "logger_name": "intake_processor", 
-        "log_level": "INFO",
-        "message": f'{{"event": "records_found", "count": {len(family_data)}}}'
-    })
+    support = categorize_support_level(
+        family_data["reading_score"], family_data["math_score"], family_data["focus_score"]
+    )
+    reading = family_data["reading_score"].astype(str)
+    math = family_data["math_score"].astype(str)
+    focus = family_data["focus_score"].astype(str)
+    started = (
+        '{"event": "categorization_started", "reading": ' + reading
+        + ', "math": ' + math + ', "focus": ' + focus + "}"
+    )
+    completed = '{"event": "categorization_complete", "result": "' + support + '"}'
+    processed = (
+        '{"event": "family_processed", "family_id": ' + family_data["family_id"].astype(str)
+        + ', "family_name": "' + family_data["family_name"] + '"}'
+    )
+    messages = [
+        '{"event": "batch_started"}',
+        f'{{"event": "records_found", "count": {n}}}',
+        *np.column_stack([started, completed, processed]).ravel(),
+        f'{{"event": "batch_complete", "total": {n}}}',
+    ]
     
-    for idx, row in family_data.iterrows():
-        t = base_time + datetime.timedelta(seconds=2 + idx*2)
-        logs.append({
-            "timestamp": t,
-            "logger_name": "support_categorizer",
-            "log_level": "INFO",
-            "message": f'{{"event": "categorization_started", "reading": {row["reading_score"]}, "math": {row["math_score"]}, "focus": {row["focus_score"]}}}'
-        })
-        logs.append({
-            "timestamp": t + datetime.timedelta(milliseconds=500),
-            "logger_name": "support_categorizer",
-            "log_level": "INFO", 
-            "message": f'{{"event": "categorization_complete", "result": "{categorize_support_level(row["reading_score"], row["math_score"], row["focus_score"])}"}}'
-        })
-        logs.append({
-            "timestamp": t + datetime.timedelta(seconds=1),
-            "logger_name": "intake_processor",
-            "log_level": "INFO",
-            "message": f'{{"event": "family_processed", "family_id": {row["family_id"]}, "family_name": "{row["family_name"]}"}}'
-        })
-    
-    logs.append({
-        "timestamp": base_time + datetime.timedelta(seconds=15),
-        "logger_name": "intake_processor",
+    return pd.DataFrame({
+        "timestamp": timestamps,
+        "logger_name": loggers,
         "log_level": "INFO",
-        "message": f'{{"event": "batch_complete", "total": {len(family_data)}}}'
+        "message": messages,
     })
-    
-    return pd.DataFrame(logs)
 
 def generate_mock_traces(family_data):
     """Generate mock trace events"""
-    traces = []
-    base_time = datetime.datetime.now() - datetime.timedelta(minutes=5)
+    n = len(family_data)
+    base_time = np.datetime64(datetime.datetime.now()) - np.timedelta64(5, "m")
+    
+    # Per family: categorization complete, family processed
+    family_ms = 2_000 + np.arange(n) * 2_000
+    offsets_ms = np.concatenate([
+        [0],
+        np.column_stack([family_ms + 500, family_ms + 1_000]).ravel(),
+        [15_000],
+    ])
+    timestamps = base_time + offsets_ms.astype("timedelta64[ms]")
+    
+    event_names = (
+        ["batch_processing_started"]
+        + ["categorization_complete", "family_processed"] * n
+        + ["batch_processing_complete"]
+    )
     
-    traces.append({
-        "timestamp": base_time,
-        "event_name": "batch_processing_started",
-        "event_details": "{}"
-    })
+    support = categorize_support_level(
+        family_data["reading_score"], family_data["math_score"], family_data["focus_score"]
+    )
+    levels = support.str.split(":", n=1).str[0]
+    scores = family_data[["reading_score", "math_score", "focus_score"]].to_numpy()
+    avgs = pd.Series(scores.mean(axis=1), index=family_data.index)
+    areas_counts = pd.Series((scores < 70).sum(axis=1), index=family_data.index)
+    completed = (
+        '{"level": "' + levels + '", "areas_count": ' + areas_counts.astype(str)
+        + ', "avg_score": ' + avgs.map("{:.1f}".format) + "}"
+    )
+    processed = '{"family_id": ' + family_data["family_id"].astype(str) + ', "category": "' + support + '"}'
+    event_details = [
+        "{}",
+        *np.column_stack([completed, processed]).ravel(),
+        f'{{"total_processed": {n}}}',
+    ]
     
-    for idx, row in family_data.iterrows():
-        t = base_time + datetime.timedelta(seconds=2 + idx*2)
-        avg = (row["reading_score"] + row["math_score"] + row["focus_score"]) / 3
-        areas = sum([1 for s in [row["reading_score"], row["math_score"], row["focus_score"]] if s < 70])
-        
-        traces.append({
-            "timestamp": t + datetime.timedelta(milliseconds=500),
-            "event_name": "categorization_complete",
-            "event_details": f'{{"level": "{categorize_support_level(row["reading_score"], row["math_score"], row["focus_score"]).split(":")[0]}", "areas_count": {areas}, "avg_score": {avg:.1f}}}'
-        })
-        traces.append({
-            "timestamp": t + datetime.timedelta(seconds=1),
-            "event_name": "family_processed",
-            "event_details": f'{{"family_id": {row["family_id"]}, "category": "{categorize_support_level(row["reading_score"], row["math_score"], row["focus_score"])}"}}'
-        })
-    
-    traces.append({
-        "timestamp": base_time + datetime.timedelta(seconds=15),
-        "event_name": "batch_processing_complete",
-        "event_details": f'{{"total_processed": {len(family_data)}}}'
+    return pd.DataFrame({
+        "timestamp": timestamps,
+        "event_name": event_names,
+        "event_details": event_details,
     })
-    
-    return pd.DataFrame(traces)
 
 def generate_mock_spans(family_data):
     """Generate mock span attributes"""
-    spans = []
-    base_time = datetime.datetime.now() - datetime.timedelta(minutes=5)
+    n = len(family_data)
+    base_time = np.datetime64(datetime.datetime.now()) - np.timedelta64(5, "m")
     
-    spans.append({
-        "timestamp": base_time,
-        "function_name": "PROCESS_FAMILY_INTAKES",
-        "custom_attributes": f'{{"batch.status": "started", "batch.record_count": {len(family_data)}}}'
-    })
+    offsets_ms = np.concatenate([[0], 2_000 + np.arange(n) * 2_000, [15_000]])
+    timestamps = base_time + offsets_ms.astype("timedelta64[ms]")
     
-    for idx, row in family_data.iterrows():
-        t = base_time + datetime.timedelta(seconds=2 + idx*2)
-        result = categorize_support_level(row["reading_score"], row["math_score"], row["focus_score"])
-        spans.append({
-            "timestamp": t,
-            "function_name": "CATEGORIZE_SUPPORT_LEVEL",
-            "custom_attributes": f'{{"input.reading_score": {row["reading_score"]}, "input.math_score": {row["math_score"]}, "input.focus_score": {row["focus_score"]}, "output.result": "{result}"}}'
-        })
-    
-    spans.append({
-        "timestamp": base_time + datetime.timedelta(seconds=15),
-        "function_name": "PROCESS_FAMILY_INTAKES",
-        "custom_attributes": f'{{"batch.status": "completed", "batch.processed_count": {len(family_data)}}}'
-    })
+    function_names = (
+        ["PROCESS_FAMILY_INTAKES"]
+        + ["CATEGORIZE_SUPPORT_LEVEL"] * n
+        + ["PROCESS_FAMILY_INTAKES"]
+    )
     
-    return pd.DataFrame(spans)
+    support = categorize_support_level(
+        family_data["reading_score"], family_data["math_score"], family_data["focus_score"]
+    )
+    custom_attributes = [
+        f'{{"batch.status": "started", "batch.record_count": {n}}}',
+        *(
+            '{"input.reading_score": ' + family_data["reading_score"].astype(str)
+            + ', "input.math_score": ' + family_data["math_score"].astype(str)
+            + ', "input.focus_score": ' + family_data["focus_score"].astype(str)
+            + ', "output.result": "' + support + '"}'
+        ),
+        f'{{"batch.status": "completed", "batch.processed_count": {n}}}',
+    ]
+    
+    return pd.DataFrame({
+        "timestamp": timestamps,
+        "function_name": function_names,
+        "custom_attributes": custom_attributes,
+    })
 
 def generate_mock_metrics():
     """Generate mock CPU/memory metrics"""
-    metrics = []
-    base_time = datetime.datetime.now() - datetime.timedelta(minutes=5)
-    
-    for i in range(10):
-        t = base_time + datetime.timedelta(seconds=i*1.5)
-        metrics.append({
-            "timestamp": t,
-            "function_name": "CATEGORIZE_SUPPORT_LEVEL",
-            "metric_name": "process.cpu.utilization",
-            "metric_value": round(random.uniform(0.05, 0.25), 3)
-        })
-        metrics.append({
-            "timestamp": t,
-            "function_name": "CATEGORIZE_SUPPORT_LEVEL",
-            "metric_name": "process.memory.usage",
-            "metric_value": random.randint(40000000, 80000000)
-        })
-    
-    for i in range(5):
-        t = base_time + datetime.timedelta(seconds=i*3)
-        metrics.append({
-            "timestamp": t,
-            "function_name": "PROCESS_FAMILY_INTAKES",
-            "metric_name": "process.cpu.utilization",
-            "metric_value": round(random.uniform(0.10, 0.35), 3)
-        })
-        metrics.append({
-            "timestamp": t,
-            "function_name": "PROCESS_FAMILY_INTAKES",
-            "metric_name": "process.memory.usage",
-            "metric_value": random.randint(60000000, 120000000)
-        })
-    
-    return pd.DataFrame(metrics)
+    rng = np.random.default_rng()
+    base_time = np.datetime64(datetime.datetime.now()) - np.timedelta64(5, "m")
+    
+    # Each sample timestamp gets a CPU row followed by a memory row
+    udf_times = pd.date_range(start=base_time, periods=10, freq="1500ms")
+    udf_cpu = rng.uniform(0.05, 0.25, size=10).round(3)
+    udf_mem = rng.integers(40_000_000, 80_000_000, size=10, endpoint=True)
+    
+    proc_times = pd.date_range(start=base_time, periods=5, freq="3s")
+    proc_cpu = rng.uniform(0.10, 0.35, size=5).round(3)
+    proc_mem = rng.integers(60_000_000, 120_000_000, size=5, endpoint=True)
+    
+    return pd.DataFrame({
+        "timestamp": np.concatenate([udf_times.repeat(2), proc_times.repeat(2)]),
+        "function_name": ["CATEGORIZE_SUPPORT_LEVEL"] * 20 + ["PROCESS_FAMILY_INTAKES"] * 10,
+        "metric_name": ["process.cpu.utilization", "process.memory.usage"] * 15,
+        "metric_value": np.concatenate([
+            np.column_stack([udf_cpu, udf_mem]).ravel(),
+            np.column_stack([proc_cpu, proc_mem]).ravel(),
+        ]),
+    })
+
+@st.cache_data(ttl=600, hash_funcs=_FAMILY_HASH_FUNCS)
+def build_telemetry(family_data, run_started_at):
+    """
+    Generate all mock telemetry for a batch: (logs, traces, spans, metrics).
+    run_started_at only keys the cache, so a new run never reuses old telemetry.
+    """
+    return (
+        generate_mock_logs(family_data),
+        generate_mock_traces(family_data),
+        generate_mock_spans(family_data),
+        generate_mock_metrics(),
+    )
 
 # ============================================================================
 # SESSION STATE INITIALIZATION
@@ -214,6 +240,10 @@ if "families_processed" not in st.session_state:
     st.session_state.families_processed = False
 if "processing_time" not in st.session_state:
     st.session_state.processing_time = None
+if "display_df" not in st.session_state:
+    st.session_state.display_df = None
+if "run_started_at" not in st.session_state:
+    st.session_state.run_started_at = None
 
 # ============================================================================
 # SIDEBAR
@@ -256,6 +286,8 @@ with st.sidebar:
     if st.button("Reset Demo", type="secondary", use_container_width=True):
         st.session_state.families_processed = False
         st.session_state.processing_time = None
+        st.session_state.display_df = None
+        st.session_state.run_started_at = None
         st.rerun()
 
 # ============================================================================
@@ -333,6 +365,9 @@ with col4:
 
 st.divider()
 
+if st.session_state.families_processed:
+    logs_df, traces_df, spans_df, metrics_df = build_telemetry(families_df, st.session_state.run_started_at)
+
 # ============================================================================
 # MAIN TABS
 # ============================================================================
@@ -355,16 +390,9 @@ with tab1:
     with col_left:
         st.markdown("#### Families Awaiting Processing")
         
-        display_df = families_df.copy()
-        if st.session_state.families_processed:
-            display_df["support_category"] = display_df.apply(
-                lambda row: categorize_support_level(row["reading_score"], row["math_score"], row["focus_score"]),
-                axis=1
-            )
-            display_df["status"] = "Processed"
-        else:
-            display_df["support_category"] = "Pending..."
-            display_df["status"] = "Waiting"
+        display_df = st.session_state.display_df
+        if display_df is None:
+            display_df = families_df.assign(support_category="Pending...", status="Waiting")
         
         st.dataframe(
             display_df,
@@ -394,15 +422,23 @@ with tab1:
                     progress_bar = st.progress(0, text="Starting batch...")
                     start_time = time.time()
                     
-                    for i, row in families_df.iterrows():
+                    family_names = families_df["family_name"].tolist()
+                    for i, family_name in enumerate(family_names):
                         progress_bar.progress(
-                            (i + 1) / len(families_df),
-                            text=f"Processing {row['family_name']}..."
+                            (i + 1) / len(family_names),
+                            text=f"Processing {family_name}..."
                         )
                         time.sleep(0.3)
                     
                     st.session_state.processing_time = time.time() - start_time
+                    st.session_state.run_started_at = start_time
                     st.session_state.families_processed = True
+                    st.session_state.display_df = families_df.assign(
+                        support_category=categorize_support_level(
+                            families_df["reading_score"], families_df["math_score"], families_df["focus_score"]
+                        ),
+                        status="Processed"
+                    )
                     progress_bar.progress(100, text="Complete!")
                     st.toast("All families processed!")
                     time.sleep(0.5)
@@ -438,14 +474,13 @@ with tab2:
     """)
     
     if st.session_state.families_processed:
-        logs_df = generate_mock_logs(families_df)
-        
+        loggers = logs_df["logger_name"].unique()
         col1, col2 = st.columns([1, 3])
         with col1:
             logger_filter = st.multiselect(
                 "Filter by Logger",
-                options=logs_df["logger_name"].unique(),
-                default=logs_df["logger_name"].unique()
+                options=loggers,
+                default=loggers
             )
         
         filtered_logs = logs_df[logs_df["logger_name"].isin(logger_filter)]
@@ -479,8 +514,6 @@ with tab3:
     """)
     
     if st.session_state.families_processed:
-        traces_df = generate_mock_traces(families_df)
-        
         st.dataframe(
             traces_df,
             use_container_width=True,
@@ -511,15 +544,13 @@ with tab4:
     """)
     
     if st.session_state.families_processed:
-        spans_df = generate_mock_spans(families_df)
-        
         function_filter = st.selectbox(
             "Filter by Function",
             options=["All"] + list(spans_df["function_name"].unique())
         )
         
         if function_filter != "All":
-            spans_df = spans_df[spans_df["function_name"] == function_filter]
+            spans_df = spans_df[spans_df["function_name"].eq(function_filter)]
         
         st.dataframe(
             spans_df,
@@ -547,22 +578,21 @@ with tab5:
     """)
     
     if st.session_state.families_processed:
-        metrics_df = generate_mock_metrics()
-        
         metric_col1, metric_col2 = st.columns(2)
         
         with metric_col1:
             st.markdown("#### CPU Utilization")
-            cpu_df = metrics_df[metrics_df["metric_name"] == "process.cpu.utilization"].copy()
-            cpu_df = cpu_df.set_index("timestamp")
-            st.line_chart(cpu_df["metric_value"], use_container_width=True)
+            cpu = metrics_df[metrics_df["metric_name"].eq("process.cpu.utilization")].set_index("timestamp")["metric_value"]
+            st.line_chart(cpu, use_container_width=True)
         
         with metric_col2:
             st.markdown("#### Memory Usage")
-            mem_df = metrics_df[metrics_df["metric_name"] == "process.memory.usage"].copy()
-            mem_df["metric_value_mb"] = mem_df["metric_value"] / 1_000_000
-            mem_df = mem_df.set_index("timestamp")
-            st.line_chart(mem_df["metric_value_mb"], use_container_width=True)
+            mem_mb = (
+                metrics_df.loc[metrics_df["metric_name"].eq("process.memory.usage"), ["timestamp", "metric_value"]]
+                .assign(metric_value_mb=lambda d: d["metric_value"] / 1_000_000)
+                .set_index("timestamp")["metric_value_mb"]
+            )
+            st.line_chart(mem_mb, use_container_width=True)
         
         with st.expander("Raw Metrics Data"):
             st.dataframe(metrics_df, use_container_width=True, hide_index=True)
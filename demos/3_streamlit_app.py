@@ -8,15 +8,14 @@ Data flows: RAW_INTERACTIONS -> 5 Dynamic Tables -> ENGAGEMENT_DASHBOARD
 Key Features:
 - Dual-mode session (Snowsight or local execution)
 - Custom CSS styling for elevated KPI tiles
-- Auto-refresh with 30-second cache
+- Auto-refresh: 30-second change check, reloads only when the pipeline refreshes
 - Responsive layout with modular components
 ================================================================================
 """
 
 import streamlit as st
-import pandas as pd
-import altair as alt
 import os
+from snowflake.snowpark.exceptions import SnowparkSQLException
 
 # ==============================================================================
 # STYLES MODULE
@@ -29,12 +28,7 @@ import os
 # - Smooth hover transition for interactivity
 # ==============================================================================
 
-def load_styles():
-    """
-    Inject custom CSS into the Streamlit app.
-    Targets the [data-testid="stMetric"] elements which wrap st.metric() calls.
-    """
-    st.markdown("""
+_STYLES_HTML = """
         <style>
         /* KPI Tile Styling - Creates floating card effect */
         [data-testid="stMetric"] {
@@ -70,7 +64,15 @@ def load_styles():
             color: #212529;
         }
         </style>
-    """, unsafe_allow_html=True)
+"""
+
+def load_styles():
+    """
+    Inject custom CSS into the Streamlit app.
+    Targets the [data-testid="stMetric"] elements which wrap st.metric() calls.
+    Injected on every run: Streamlit drops elements a rerun does not re-emit.
+    """
+    st.markdown(_STYLES_HTML, unsafe_allow_html=True)
 
 
 # ==============================================================================
@@ -81,10 +83,12 @@ def load_styles():
 # Locally: Creates session using connection_name from environment variable
 # ==============================================================================
 
+@st.cache_resource
 def get_session():
     """
     Create a Snowpark session that works in both Snowsight and local environments.
     Falls back to connection_name if get_active_session() is not available.
+    Cached as a resource so every rerun reuses the same session object.
     """
     try:
         from snowflake.snowpark.context import get_active_session
@@ -100,72 +104,104 @@ def get_session():
 # ==============================================================================
 # DATA MODULE  
 # ==============================================================================
-# Cached data loading functions. Each function queries the Dynamic Tables
-# and caches results for 30 seconds to balance freshness with performance.
-# TTL ensures data stays relatively current without hammering the database.
+# Cached data loading functions. A cheap probe of the dashboard's
+# REPORT_GENERATED_AT runs at most every 30 seconds; the heavier loaders are
+# cached on that value, so they only re-query after the Dynamic Tables have
+# actually refreshed instead of on a blind timer.
+# The page's queries (Overview and the member charts) are fired together as
+# async jobs so a cold load waits on the slowest query instead of their sum.
+# Only the version probe before them and the filterable table's segment
+# query, which depends on widget input, run on their own.
 # ==============================================================================
 
 def init_session():
     """Initialize session. Uses fully qualified names for Snowsight compatibility."""
     return get_session()
 
+DASHBOARD_SQL = "SELECT * FROM UNDERSTOOD_DEMO.DYNAMIC_TABLES.ENGAGEMENT_DASHBOARD"
+
+# Both groupings come back from a single GROUPING SETS query;
+# GROUPING(member_type) = 1 tags the region rows.
+BREAKDOWN_SQL = """
+    SELECT member_type, region, GROUPING(member_type) as by_region, COUNT(*) as count 
+    FROM UNDERSTOOD_DEMO.DYNAMIC_TABLES.MEMBER_ENGAGEMENT_SUMMARY
+    GROUP BY GROUPING SETS ((member_type), (region))
+"""
+
+# Enough rows for the ranked bar chart; the card layout shows a prefix of them.
+TOP_MEMBERS_LIMIT = 15
+
+TOP_MEMBERS_SQL = f"""
+    SELECT member_name, member_type, region, total_sessions,
+           engagement_minutes, favorite_topic
+    FROM UNDERSTOOD_DEMO.DYNAMIC_TABLES.MEMBER_ENGAGEMENT_SUMMARY
+    ORDER BY lifetime_engagement_seconds DESC
+    LIMIT {TOP_MEMBERS_LIMIT}
+"""
+
+# Only the columns the scatter plot encodes; it needs every row but no order.
+ALL_MEMBERS_SQL = """
+    SELECT member_name, member_type, region, total_sessions,
+           engagement_minutes, unique_resources
+    FROM UNDERSTOOD_DEMO.DYNAMIC_TABLES.MEMBER_ENGAGEMENT_SUMMARY
+"""
+
 @st.cache_data(ttl=30)
-def load_dashboard(_session):
+def load_data_version(_session):
     """
-    Load org-wide KPIs from the final Dynamic Table.
-    Returns a single row with all executive metrics.
+    Return the dashboard's REPORT_GENERATED_AT, which changes each time the
+    pipeline refreshes. Used as the cache key for every other loader.
     """
-    return _session.sql("SELECT * FROM UNDERSTOOD_DEMO.DYNAMIC_TABLES.ENGAGEMENT_DASHBOARD").to_pandas()
+    return _session.sql(
+        "SELECT MAX(report_generated_at) FROM UNDERSTOOD_DEMO.DYNAMIC_TABLES.ENGAGEMENT_DASHBOARD"
+    ).collect()[0][0]
 
-@st.cache_data(ttl=30)
-def load_top_members(_session, limit=10):
+@st.cache_data(max_entries=4)
+def load_page_data(_session, data_version):
     """
-    Load the most engaged members ranked by lifetime engagement.
-    Used for the leaderboard table display.
+    Load the page's data in one round of queries: org-wide KPIs, member
+    counts by type/region, the top members and every member for the
+    scatter plot. The queries are submitted as async jobs so Snowflake runs
+    them concurrently and the app waits once.
+    Returns (dashboard, types, regions, top_members, members) DataFrames.
     """
-    return _session.sql(f"""
-        SELECT member_name, member_type, region, total_sessions, 
-               lifetime_engagement_seconds, favorite_topic, last_activity
-        FROM UNDERSTOOD_DEMO.DYNAMIC_TABLES.MEMBER_ENGAGEMENT_SUMMARY 
-        ORDER BY lifetime_engagement_seconds DESC 
-        LIMIT {limit}
-    """).to_pandas()
+    jobs = [
+        _session.sql(query).to_pandas(block=False)
+        for query in (DASHBOARD_SQL, BREAKDOWN_SQL, TOP_MEMBERS_SQL, ALL_MEMBERS_SQL)
+    ]
+    dashboard, breakdown, top_members, members = (job.result() for job in jobs)
+    types, regions = split_breakdown(breakdown)
+    return dashboard, types, regions, top_members, members
 
-@st.cache_data(ttl=30)
-def load_all_members(_session):
+@st.cache_data(max_entries=100)
+def load_filtered_members(_session, data_version, member_type, region, limit):
     """
-    Load all members with full engagement details for exploration views.
-    Used in the tabbed member exploration section.
+    Read the top `limit` members of one type/region segment, cached per data
+    version and shared by all viewers. 'All' disables that filter. Filter
+    values are bind variables, so every selection reuses the same SQL text.
     """
-    return _session.sql("""
-        SELECT 
-            member_name, 
-            member_type, 
-            region, 
-            total_sessions,
-            lifetime_engagement_seconds,
-            ROUND(lifetime_engagement_seconds / 60, 1) as engagement_minutes,
-            favorite_topic, 
-            last_activity,
-            unique_resources
-        FROM UNDERSTOOD_DEMO.DYNAMIC_TABLES.MEMBER_ENGAGEMENT_SUMMARY 
+    where, params = [], []
+    if member_type != 'All':
+        where.append("member_type = ?")
+        params.append(member_type)
+    if region != 'All':
+        where.append("region = ?")
+        params.append(region)
+    where_clause = f"WHERE {' AND '.join(where)}" if where else ""
+    return _session.sql(f"""
+        SELECT member_name, member_type, region, total_sessions,
+               engagement_minutes, favorite_topic
+        FROM UNDERSTOOD_DEMO.DYNAMIC_TABLES.MEMBER_ENGAGEMENT_SUMMARY
+        {where_clause}
         ORDER BY lifetime_engagement_seconds DESC
-    """).to_pandas()
+        LIMIT {int(limit)}
+    """, params=params).to_pandas()
 
-@st.cache_data(ttl=30)
-def load_member_breakdown(_session):
-    """
-    Load aggregated member counts by type and region.
-    Used for the bar chart visualizations.
-    """
-    types = _session.sql("""
-        SELECT member_type, COUNT(*) as count 
-        FROM UNDERSTOOD_DEMO.DYNAMIC_TABLES.MEMBER_ENGAGEMENT_SUMMARY GROUP BY member_type
-    """).to_pandas()
-    regions = _session.sql("""
-        SELECT region, COUNT(*) as count 
-        FROM UNDERSTOOD_DEMO.DYNAMIC_TABLES.MEMBER_ENGAGEMENT_SUMMARY GROUP BY region
-    """).to_pandas()
+def split_breakdown(breakdown):
+    """Split the GROUPING SETS breakdown into (types, regions) count frames."""
+    by_region = breakdown['BY_REGION'] == 1
+    types = breakdown.loc[~by_region, ['MEMBER_TYPE', 'COUNT']].reset_index(drop=True)
+    regions = breakdown.loc[by_region, ['REGION', 'COUNT']].reset_index(drop=True)
     return types, regions
 
 
@@ -215,14 +251,14 @@ def render_kpi_tiles(row):
     col7.metric("Registered Members", row['REGISTERED_MEMBERS'])
     col8.metric("Free Members", row['FREE_MEMBERS'])
 
-def render_charts(session):
+def render_charts(types_df, regions_df):
     """
     Render the member breakdown charts side by side using Altair.
     Left: Members by membership type (free/registered/premium)
     Right: Members by geographic region
     """
-    types_df, regions_df = load_member_breakdown(session)
-    
+    import altair as alt
+
     type_order = ['free', 'registered', 'premium']
     type_colors = ['#6366f1', '#8b5cf6', '#a855f7']
     region_colors = ['#06b6d4', '#14b8a6', '#10b981', '#22c55e', '#84cc16']
@@ -295,17 +331,19 @@ def render_charts(session):
 # 2. Scatter Plot - Sessions vs engagement with type coloring
 # 3. Filterable Table - Dynamic filtering by type and region
 # 4. Card Layout - Visual member cards with key stats
+# Charts fetch only the columns they encode (see TOP_MEMBERS_SQL and
+# ALL_MEMBERS_SQL): the whole frame is shipped to the browser with the
+# chart spec, so unused columns are pure payload.
 # ==============================================================================
 
-def render_member_exploration(session):
+def render_member_exploration(session, data_version, types_df, regions_df, top_members, members):
     """
     Render the tabbed member exploration section with 4 visualization options.
     Each tab provides a different way to explore and analyze member data.
+    top_members and members come from load_page_data's batch.
     """
     st.subheader("Member Exploration")
     
-    members_df = load_all_members(session)
-    
     tab1, tab2, tab3, tab4 = st.tabs([
         "📊 Ranked Bar Chart", 
         "🔵 Scatter Plot", 
@@ -314,16 +352,16 @@ def render_member_exploration(session):
     ])
     
     with tab1:
-        render_ranked_bar_chart(members_df)
+        render_ranked_bar_chart(top_members)
     
     with tab2:
-        render_scatter_plot(members_df)
+        render_scatter_plot(members)
     
     with tab3:
-        render_filterable_table(members_df)
+        render_filterable_table(session, data_version, types_df, regions_df)
     
     with tab4:
-        render_card_layout(members_df)
+        render_card_layout(top_members)
 
 def render_ranked_bar_chart(df):
     """
@@ -331,7 +369,9 @@ def render_ranked_bar_chart(df):
     Color-coded by member type, with detailed tooltips on hover.
     Shows top 15 members to avoid chart clutter.
     """
-    top_df = df.head(15).copy()
+    import altair as alt
+
+    top_df = df.head(15)
     
     type_colors = {'free': '#6366f1', 'registered': '#8b5cf6', 'premium': '#a855f7'}
     
@@ -372,6 +412,8 @@ def render_scatter_plot(df):
     Point size represents unique resources viewed.
     Color indicates member type. Great for spotting patterns and outliers.
     """
+    import altair as alt
+
     chart = alt.Chart(df).mark_circle(
         opacity=0.7,
         stroke='white',
@@ -406,39 +448,30 @@ def render_scatter_plot(df):
     
     st.altair_chart(chart, use_container_width=True)
 
-def render_filterable_table(df):
+def render_filterable_table(session, data_version, types_df, regions_df):
     """
     Interactive table with filter controls for type and region.
-    Allows drilling down into specific member segments.
+    Allows drilling down into specific member segments. Filter options come
+    from the breakdown counts; the filter and limit run in Snowflake.
     """
     filter_col1, filter_col2, filter_col3 = st.columns([2, 2, 1])
     
     with filter_col1:
-        types = ['All'] + sorted(df['MEMBER_TYPE'].unique().tolist())
+        types = ['All'] + sorted(types_df['MEMBER_TYPE'].tolist())
         selected_type = st.selectbox("Filter by Type", types, key="table_type")
     
     with filter_col2:
-        regions = ['All'] + sorted(df['REGION'].unique().tolist())
+        regions = ['All'] + sorted(regions_df['REGION'].tolist())
         selected_region = st.selectbox("Filter by Region", regions, key="table_region")
     
     with filter_col3:
         top_n = st.selectbox("Show Top", [10, 25, 50, 100], key="table_limit")
     
-    filtered_df = df.copy()
-    if selected_type != 'All':
-        filtered_df = filtered_df[filtered_df['MEMBER_TYPE'] == selected_type]
-    if selected_region != 'All':
-        filtered_df = filtered_df[filtered_df['REGION'] == selected_region]
-    
-    filtered_df = filtered_df.head(top_n)
-    
-    display_df = filtered_df[['MEMBER_NAME', 'MEMBER_TYPE', 'REGION', 
-                               'TOTAL_SESSIONS', 'ENGAGEMENT_MINUTES', 
-                               'FAVORITE_TOPIC']].copy()
+    display_df = load_filtered_members(session, data_version, selected_type, selected_region, top_n)
     display_df.columns = ['Name', 'Type', 'Region', 'Sessions', 'Engagement (min)', 'Favorite Topic']
     
     st.dataframe(display_df, use_container_width=True, hide_index=True)
-    st.caption(f"Showing {len(display_df)} of {len(df)} members")
+    st.caption(f"Showing {len(display_df)} of {types_df['COUNT'].sum()} members")
 
 def render_card_layout(df):
     """
@@ -454,63 +487,80 @@ def render_card_layout(df):
         'premium': '#a855f7'
     }
     
-    cols = st.columns(4)
+    # Per-card lookups and truncations are done column-wise up front
+    badge_colors = top_members['MEMBER_TYPE'].map(type_colors).fillna('#6b7280')
+    names = top_members['MEMBER_NAME']
     
-    for idx, (_, member) in enumerate(top_members.iterrows()):
-        col = cols[idx % 4]
-        badge_color = type_colors.get(member['MEMBER_TYPE'], '#6b7280')
-        
-        with col:
-            st.markdown(f"""
-                <div style="
-                    background: linear-gradient(135deg, #ffffff 0%, #f8f9fa 100%);
-                    border: 1px solid #e5e7eb;
-                    border-radius: 12px;
-                    padding: 16px;
-                    margin-bottom: 16px;
-                    box-shadow: 0 2px 4px rgba(0,0,0,0.05);
-                ">
-                    <div style="display: flex; align-items: center; margin-bottom: 12px;">
-                        <div style="
-                            width: 40px; height: 40px;
-                            background: linear-gradient(135deg, {badge_color} 0%, {badge_color}dd 100%);
-                            border-radius: 50%;
-                            display: flex; align-items: center; justify-content: center;
-                            color: white; font-weight: bold; font-size: 16px;
-                            margin-right: 12px;
-                        ">{member['MEMBER_NAME'][0]}</div>
-                        <div>
-                            <div style="font-weight: 600; color: #1f2937; font-size: 14px;">
-                                {member['MEMBER_NAME'][:18]}
-                            </div>
-                            <span style="
-                                background: {badge_color}22;
-                                color: {badge_color};
-                                padding: 2px 8px;
-                                border-radius: 12px;
-                                font-size: 11px;
-                                font-weight: 500;
-                            ">{member['MEMBER_TYPE']}</span>
+    # Cards are laid out by one 4-column CSS grid and sent in a single
+    # st.markdown call
+    cards = []
+    members = zip(
+        names.str[0].to_numpy(),
+        names.str[:18].to_numpy(),
+        top_members['MEMBER_TYPE'].to_numpy(),
+        top_members['TOTAL_SESSIONS'].to_numpy(),
+        top_members['ENGAGEMENT_MINUTES'].to_numpy(),
+        top_members['FAVORITE_TOPIC'].str[:20].to_numpy(),
+        badge_colors.to_numpy(),
+    )
+    for initial, short_name, member_type, sessions, minutes, favorite, badge_color in members:
+        cards.append(f"""
+            <div style="
+                background: linear-gradient(135deg, #ffffff 0%, #f8f9fa 100%);
+                border: 1px solid #e5e7eb;
+                border-radius: 12px;
+                padding: 16px;
+                box-shadow: 0 2px 4px rgba(0,0,0,0.05);
+            ">
+                <div style="display: flex; align-items: center; margin-bottom: 12px;">
+                    <div style="
+                        width: 40px; height: 40px;
+                        background: linear-gradient(135deg, {badge_color} 0%, {badge_color}dd 100%);
+                        border-radius: 50%;
+                        display: flex; align-items: center; justify-content: center;
+                        color: white; font-weight: bold; font-size: 16px;
+                        margin-right: 12px;
+                    ">{initial}</div>
+                    <div>
+                        <div style="font-weight: 600; color: #1f2937; font-size: 14px;">
+                            {short_name}
                         </div>
+                        <span style="
+                            background: {badge_color}22;
+                            color: {badge_color};
+                            padding: 2px 8px;
+                            border-radius: 12px;
+                            font-size: 11px;
+                            font-weight: 500;
+                        ">{member_type}</span>
                     </div>
-                    <div style="display: grid; grid-template-columns: 1fr 1fr; gap: 8px; font-size: 12px;">
-                        <div>
-                            <div style="color: #6b7280;">Sessions</div>
-                            <div style="font-weight: 600; color: #1f2937;">{member['TOTAL_SESSIONS']}</div>
-                        </div>
-                        <div>
-                            <div style="color: #6b7280;">Minutes</div>
-                            <div style="font-weight: 600; color: #1f2937;">{member['ENGAGEMENT_MINUTES']:.0f}</div>
-                        </div>
-                        <div style="grid-column: span 2;">
-                            <div style="color: #6b7280;">Favorite</div>
-                            <div style="font-weight: 500; color: #374151; font-size: 11px;">
-                                {member['FAVORITE_TOPIC'][:20]}
-                            </div>
+                </div>
+                <div style="display: grid; grid-template-columns: 1fr 1fr; gap: 8px; font-size: 12px;">
+                    <div>
+                        <div style="color: #6b7280;">Sessions</div>
+                        <div style="font-weight: 600; color: #1f2937;">{sessions}</div>
+                    </div>
+                    <div>
+                        <div style="color: #6b7280;">Minutes</div>
+                        <div style="font-weight: 600; color: #1f2937;">{minutes:.0f}</div>
+                    </div>
+                    <div style="grid-column: span 2;">
+                        <div style="color: #6b7280;">Favorite</div>
+                        <div style="font-weight: 500; color: #374151; font-size: 11px;">
+                            {favorite}
                         </div>
                     </div>
                 </div>
-            """, unsafe_allow_html=True)
+            </div>
+        """)
+    
+    # Strip each card so no blank line splits the wrapper's HTML block
+    st.markdown(
+        '<div style="display: grid; grid-template-columns: repeat(4, 1fr); gap: 16px;">'
+        + "".join(card.strip() for card in cards)
+        + '</div>',
+        unsafe_allow_html=True
+    )
 
 # ==============================================================================
 # MAIN APPLICATION
@@ -530,7 +580,15 @@ def main():
     render_sidebar()
     render_header()
     
-    dashboard = load_dashboard(session)
+    # A missing pipeline, or one created before a column this app reads
+    # (e.g. ENGAGEMENT_MINUTES) was added, fails here with a SQL error.
+    try:
+        data_version = load_data_version(session)
+        dashboard, types_df, regions_df, top_members, members = load_page_data(session, data_version)
+    except SnowparkSQLException:
+        st.error("Could not read the Dynamic Tables pipeline. It is missing or out of date.")
+        st.info("Go to the notebook and execute all cells to recreate the pipeline.")
+        return
     
     if len(dashboard) > 0:
         row = dashboard.iloc[0]
@@ -543,10 +601,12 @@ def main():
             st.markdown("---")
             render_kpi_tiles(row)
             st.markdown("---")
-            render_charts(session)
+            render_charts(types_df, regions_df)
         
         with explore_tab:
-            render_member_exploration(session)
+            render_member_exploration(
+                session, data_version, types_df, regions_df, top_members, members
+            )
     
     else:
         st.error("No data found in ENGAGEMENT_DASHBOARD. Run the Dynamic Tables notebook first!")